@@ -8,10 +8,14 @@ Declarative CLI package.
 __all__ = ("Frontend", "create_cli_parser")
 
 import enum
-from typing import Type
-
-import yaml
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Optional, Type
 
+from . import _schema
 from ._schema import RootNode
 from ._utils import PathLike
 from .clis import bot as bot_cli
@@ -33,8 +37,77 @@ class Frontend(enum.Enum):
             raise ValueError("Unsupported frontend")
 
 
+@functools.lru_cache(maxsize=64)
+def _load_schema(path: str, mtime_ns: int) -> RootNode:
+    """
+    Load a CLI schema from file.
+
+    The modification time is only used as part of the cache key, so that the
+    schema is reloaded if the file changes.
+    """
+    # Imported here so that yaml is only imported if a schema needs parsing.
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+
+    with open(path) as f:
+        return RootNode.from_dict(yaml.load(f, Loader=Loader))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_schema_with_file_cache(path: str, mtime_ns: int, cache_dir: str) -> RootNode:
+    """
+    Load a CLI schema, using a pickled copy from a previous load if available.
+
+    There is one cache file per schema path. It stores the schema along with a
+    key of the schema file's modification time and the modification time of
+    the schema module, so that stale pickles aren't used after either changes.
+    """
+    try:
+        key = (mtime_ns, os.stat(_schema.__file__).st_mtime_ns)
+        path_hash = hashlib.sha1(path.encode()).hexdigest()
+        cache_file = os.path.join(cache_dir, "schema-{}.pickle".format(path_hash))
+    except Exception:
+        # Unable to determine the cache key, e.g. if imported from a zip file.
+        return _load_schema(path, mtime_ns)
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, schema = pickle.load(f)
+        if cached_key == key:
+            return schema
+    except Exception:
+        # Missing or unreadable cache, fall back to loading the schema file.
+        pass
+
+    schema = _load_schema(path, mtime_ns)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file and rename it so that the cache file is
+        # only ever seen complete.
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, schema), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+    except OSError:
+        # Failing to write the cache shouldn't stop the CLI from working.
+        pass
+    return schema
+
+
 def create_cli_parser(
-    file: PathLike, frontend: Frontend = Frontend.ARGPARSE, **kwargs
+    file: PathLike,
+    frontend: Frontend = Frontend.ARGPARSE,
+    *,
+    cache_dir: Optional[PathLike] = None,
+    **kwargs
 ) -> clis.AbstractCLIParser:
     """
     Create and return a CLI parser.
@@ -43,11 +116,20 @@ def create_cli_parser(
         The file declaring the CLI.
     :param frontend:
         The frontend to use for parsing the CLI args.
+    :param cache_dir:
+        A directory in which to cache the loaded schema between runs, or None
+        to always load the schema from the file.
     :param kwargs:
         Passed on the to CLI parser at creation.
     :return:
         A CLI parser instance.
     """
-    with open(file) as f:
-        loaded_schema = RootNode.from_dict(yaml.safe_load(f))
+    path = os.path.abspath(str(file))
+    mtime_ns = os.stat(path).st_mtime_ns
+    if cache_dir is None:
+        loaded_schema = _load_schema(path, mtime_ns)
+    else:
+        loaded_schema = _load_schema_with_file_cache(
+            path, mtime_ns, os.path.abspath(str(cache_dir))
+        )
     return frontend.get_parser()(loaded_schema, **kwargs)
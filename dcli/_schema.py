@@ -8,12 +8,24 @@ Parsing of a CLI schema.
 __all__ = ("Arg", "NodeBase", "RootNode", "SubNode")
 
 import typing
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+
+# TODO: 'type' should be an enum rather than a Python type.
+_ACCEPTED_TYPES = {
+    "integer": int,
+    "string": str,
+    "float": float,
+    "flag": bool,
+    "text": list,
+}  # type: Dict[str, typing.Type]
 
 
 class Arg:
     """Schema arg."""
 
+    __slots__ = ("name", "help", "command", "positional", "type", "enum", "default")
+
     def __init__(
         self,
         *,
@@ -42,28 +54,31 @@ class Arg:
 
     @staticmethod
     def _process_type_field(value: str) -> typing.Type:
-        # TODO: 'type' should be an enum rather than a Python type.
-        accepted_types = {
-            "integer": int,
-            "string": str,
-            "float": float,
-            "flag": bool,
-            "text": list,
-        }
-        if value in accepted_types:
-            value = accepted_types[value]
-        else:
+        type_ = _ACCEPTED_TYPES.get(value)
+        if type_ is None:
             raise ValueError(
                 "Unrecognised type {!r}, accepted types are: {}".format(
-                    value, ", ".join(accepted_types)
+                    value, ", ".join(_ACCEPTED_TYPES)
                 )
             )
-        return value
+        return type_
 
 
 class NodeBase:
     """Base class for nodes."""
 
+    __slots__ = (
+        "keyword",
+        "help",
+        "command",
+        "args",
+        "subtree",
+        "parent",
+        "_keyword_map",
+        "_keyword_path",
+        "_optional_args",
+    )
+
     def __init__(
         self,
         *,
@@ -79,8 +94,38 @@ class NodeBase:
         self.args = args if args else []
         self.subtree = subtree if subtree else []
         self.parent = None  # type: Optional[NodeBase]
-        for x in subtree:
+        for x in self.subtree:
             x.parent = self
+        self._keyword_map = {x.keyword: x for x in self.subtree}
+        self._keyword_path = None  # type: Optional[Tuple[str, ...]]
+        self._optional_args = [x for x in self.args if not x.positional]
+
+    @property
+    def keyword_map(self) -> Dict[str, "NodeBase"]:
+        """Mapping of keywords to the corresponding subnodes."""
+        return self._keyword_map
+
+    @property
+    def keyword_path(self) -> Tuple[str, ...]:
+        """
+        The keywords leading to this node from the root node.
+
+        This is stored on every node in the tree when the root node is created.
+        """
+        if self._keyword_path is not None:
+            return self._keyword_path
+        # Not (yet) part of a complete tree, so calculate without storing.
+        keywords = []
+        node = self
+        while node is not None and node.keyword:
+            keywords.append(node.keyword)
+            node = node.parent
+        return tuple(reversed(keywords))
+
+    @property
+    def optional_args(self) -> List[Arg]:
+        """The optional (non-positional) args, in order."""
+        return self._optional_args
 
     @classmethod
     def from_dict(cls, data: Dict[str, typing.Any]) -> "NodeBase":
@@ -102,10 +147,20 @@ class NodeBase:
 class RootNode(NodeBase):
     """Root schema node."""
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         if "keyword" in kwargs:
             raise TypeError("__init__() got an unexpected keyword argument 'keyword'")
         super().__init__(**kwargs)
+        # Nodes are constructed bottom-up, so the tree is only complete now.
+        self._keyword_path = ()
+        stack = [self]  # type: List[NodeBase]
+        while stack:
+            node = stack.pop()
+            for x in node.subtree:
+                x._keyword_path = node._keyword_path + (x.keyword,)
+                stack.append(x)
 
     def __repr__(self):
         return "<RootNode>"
@@ -114,14 +169,11 @@ class RootNode(NodeBase):
 class SubNode(NodeBase):
     """Sub schema node."""
 
+    __slots__ = ()
+
     def __init__(self, *, keyword: str, **kwargs):
         kwargs["keyword"] = keyword
         super().__init__(**kwargs)
 
     def __repr__(self):
-        keywords = []
-        node = self
-        while node.keyword:
-            keywords.insert(0, node.keyword)
-            node = node.parent
-        return "<SubNode({})>".format(".".join(keywords))
+        return "<SubNode({})>".format(".".join(self.keyword_path))
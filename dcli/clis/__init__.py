@@ -9,14 +9,37 @@ __all__ = ("AbstractCLIParser", "Namespace")
 
 import abc
 import argparse
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .._schema import RootNode
+from .._schema import Arg, RootNode
 
 
 Namespace = argparse.Namespace
 
 
+def _get_argparse_spec(arg: Arg) -> Tuple[str, Dict[str, Any]]:
+    """
+    Get the argparse name and kwargs for a schema arg.
+
+    :param arg:
+        The schema arg.
+    :return:
+        A tuple of the name and kwargs to pass to
+        argparse.ArgumentParser.add_argument().
+    """
+    if arg.positional:
+        name = arg.name.replace("-", "_")
+    else:
+        name = "--" + arg.name
+    if arg.type is bool:
+        kwargs = {"action": "store_true"}
+    elif arg.type is list:
+        kwargs = {"nargs": argparse.REMAINDER}
+    else:
+        kwargs = {}
+    return name, kwargs
+
+
 class AbstractCLIParser(metaclass=abc.ABCMeta):
     """Abstract base class for CLI parsers."""
 
@@ -9,10 +9,10 @@ __all__ = ("CLIParser",)
 
 import argparse
 import sys
-from typing import List, NoReturn, Optional, Text
+from typing import Dict, FrozenSet, List, NoReturn, Optional, Text, Tuple
 
 from .._schema import NodeBase, RootNode
-from . import AbstractCLIParser, Namespace
+from . import AbstractCLIParser, Namespace, _get_argparse_spec
 
 
 class _ArgParseError(Exception):
@@ -38,6 +38,9 @@ class CLIParser(AbstractCLIParser):
         """
         super().__init__(schema, **kwargs)
         self._schema = schema
+        # Built parsers and their optional arg names, keyed by node.
+        self._parser_cache = {}  # type: Dict[NodeBase, Tuple]
+        self._help_cache = {}  # type: Dict[NodeBase, str]
 
     def parse_args(self, args: Optional[List[str]] = None, namespace=None) -> Namespace:
         if args is None:
@@ -45,58 +48,44 @@ class CLIParser(AbstractCLIParser):
         if namespace is None:
             namespace = Namespace()
 
-        # Take a copy of the args.
-        remaining_args = list(args)
-
-        # Determine whether to show help output.
+        # Determine whether to show help output, trimming the help args.
+        start, end = 0, len(args)
         show_help = False
-        try:
-            if remaining_args[0] == "help":
-                show_help = True
-                remaining_args.pop(0)
-            if remaining_args[-1] in ["?", "help"]:
-                show_help = True
-                remaining_args.pop(-1)
-        except IndexError:
-            pass
+        if start < end and args[start] == "help":
+            show_help = True
+            start += 1
+        if start < end and args[end - 1] in ["?", "help"]:
+            show_help = True
+            end -= 1
 
         # Loop through the args until we find a non-keyword.
         node = self._schema
-        consumed_args = []
-        while node.subtree and remaining_args:
-            arg = remaining_args[0]
-            keywords = {x.keyword: x for x in node.subtree}
-            if arg in keywords:
-                consumed_args.append(remaining_args.pop(0))
-                node = keywords[arg]
-            else:
+        cursor = start
+        while node.subtree and cursor < end:
+            subnode = node.keyword_map.get(args[cursor])
+            if subnode is None:
                 break
+            node = subnode
+            cursor += 1
+        remaining_args = list(args[cursor:end])
 
         if show_help:
             print(self.format_help(node))
             sys.exit(0)
 
         # Use argparse to parse the command, but don't let it give error output.
-        parser = _CustomArgumentParser(add_help=False)
-
-        argv_for_argparse = remaining_args.copy()
-        for arg in node.args:
-            if arg.positional:
-                name = arg.name.replace("-", "_")
-            else:
-                # Convert optional args to use dashes.
-                name = "--" + arg.name
-                # TODO: This is a hack, relying on no arg name/value clashes.
-                #  This also unintentionally allows specifying with the dashes!
-                argv_for_argparse = [
-                    "--" + a if a == arg.name else a for a in argv_for_argparse
-                ]
-            kwargs = dict()
-            if arg.type is bool:
-                kwargs["action"] = "store_true"
-            elif arg.type is list:
-                kwargs["nargs"] = argparse.REMAINDER
-            parser.add_argument(name, **kwargs)
+        cached = self._parser_cache.get(node)
+        if cached is None:
+            cached = self._build_parser(node)
+            self._parser_cache[node] = cached
+        parser, optional_names = cached
+
+        # Convert optional args to use dashes.
+        # TODO: This is a hack, relying on no arg name/value clashes.
+        #  This also unintentionally allows specifying with the dashes!
+        argv_for_argparse = [
+            "--" + a if a in optional_names else a for a in remaining_args
+        ]
 
         try:
             namespace = parser.parse_args(argv_for_argparse, namespace)
@@ -110,14 +99,38 @@ class CLIParser(AbstractCLIParser):
 
         return namespace
 
+    @staticmethod
+    def _build_parser(
+        node: NodeBase,
+    ) -> Tuple[_CustomArgumentParser, FrozenSet[str]]:
+        """
+        Construct an arg parser for a given node.
+
+        :param node:
+            The node to construct the parser for.
+        :return:
+            The constructed parser and the names of the optional args.
+        """
+        parser = _CustomArgumentParser(add_help=False)
+        for arg in node.args:
+            name, kwargs = _get_argparse_spec(arg)
+            parser.add_argument(name, **kwargs)
+        optional_names = frozenset(arg.name for arg in node.optional_args)
+        return parser, optional_names
+
     def format_help(self, node: NodeBase) -> str:
         """Format help text for a given node."""
+        help_text = self._help_cache.get(node)
+        if help_text is None:
+            help_text = self._build_help(node)
+            self._help_cache[node] = help_text
+        return help_text
+
+    @staticmethod
+    def _build_help(node: NodeBase) -> str:
+        """Construct help text for a given node."""
         # Start with the keywords already entered.
-        tmp_node = node
-        keywords = ["<bot>"]
-        while tmp_node.keyword:
-            keywords.insert(1, tmp_node.keyword)
-            tmp_node = tmp_node.parent
+        keywords = ["<bot>"] + list(node.keyword_path)
 
         # Include subnode options if not at the end of a chain.
         valid_end_of_chain = node.command is not None
@@ -9,10 +9,13 @@ __all__ = ("CLIParser",)
 
 import argparse
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from .._schema import RootNode
-from . import AbstractCLIParser, Namespace
+from .._schema import NodeBase, RootNode
+from . import AbstractCLIParser, Namespace, _get_argparse_spec
+
+
+_HELP_ARGS = frozenset(["-h", "--help"])
 
 
 class CLIParser(AbstractCLIParser):
@@ -30,43 +33,67 @@ class CLIParser(AbstractCLIParser):
         super().__init__(schema, **kwargs)
         self._schema = schema
         self._prog = prog
+        # Built parsers, keyed by node and whether help is being shown.
+        self._parser_cache = {}  # type: Dict[Tuple, argparse.ArgumentParser]
 
     def parse_args(self, args: Optional[List[str]] = None, namespace=None) -> Namespace:
         if args is None:
             args = sys.argv
 
-        # Take a copy of the args.
-        remaining_args = list(args)
         # Loop through the args until we find a non-keyword.
         node = self._schema
-        consumed_args = []
+        cursor = 0
         show_help = False
-        while node.subtree and remaining_args:
-            arg = remaining_args[0]
-            if arg in ["-h", "--help"]:
+        while node.subtree and cursor < len(args):
+            arg = args[cursor]
+            if arg in _HELP_ARGS:
                 # TODO: Not sure how best to handle a 'help' arg:
                 #   - Accept anywhere or only after the last given keyword
                 #   - Treat as help for last given node, or for the node it
                 #     appears directly after (break here instead of continue)
                 #  Currently accepted anywhere and enacted on last given node.
                 show_help = True
-                remaining_args.pop(0)
+                cursor += 1
                 continue
-            keywords = {x.keyword: x for x in node.subtree}
-            if arg in keywords:
-                consumed_args.append(remaining_args.pop(0))
-                node = keywords[arg]
-            else:
+            subnode = node.keyword_map.get(arg)
+            if subnode is None:
                 break
+            node = subnode
+            cursor += 1
+        remaining_args = list(args[cursor:])
 
         if show_help:
             remaining_args.insert(0, "--help")
 
-        # Construct an arg parser for the node we reached.
+        # Get an arg parser for the node we reached.
+        cache_key = (node, show_help)
+        parser = self._parser_cache.get(cache_key)
+        if parser is None:
+            parser = self._build_parser(node, show_help=show_help)
+            self._parser_cache[cache_key] = parser
+
+        args_ns = parser.parse_args(remaining_args, namespace)
+        args_ns.command = node.command
+        args_ns.remaining_args = remaining_args
+        return args_ns
+
+    def _build_parser(
+        self, node: NodeBase, *, show_help: bool
+    ) -> argparse.ArgumentParser:
+        """
+        Construct an arg parser for a given node.
+
+        :param node:
+            The node to construct the parser for.
+        :param show_help:
+            Whether help output is being requested.
+        :return:
+            The constructed parser.
+        """
         if self._prog:
-            prog_args = [self._prog] + consumed_args
+            prog_args = [self._prog] + list(node.keyword_path)
         else:
-            prog_args = consumed_args
+            prog_args = list(node.keyword_path)
         parser = argparse.ArgumentParser(
             prog=" ".join(prog_args),
             description=node.help,
@@ -80,16 +107,6 @@ class CLIParser(AbstractCLIParser):
                 subparsers.add_parser(subnode.keyword, help=subnode.help)
         # Add arguments for end-of-command.
         for arg in node.args:
-            name = arg.name.replace("-", "_") if arg.positional else "--" + arg.name
-            kwargs = dict()
-            kwargs["help"] = arg.help
-            if arg.type is bool:
-                kwargs["action"] = "store_true"
-            elif arg.type is list:
-                kwargs["nargs"] = argparse.REMAINDER
-            parser.add_argument(name, **kwargs)
-
-        args_ns = parser.parse_args(remaining_args, namespace)
-        args_ns.command = node.command
-        args_ns.remaining_args = remaining_args
-        return args_ns
+            name, kwargs = _get_argparse_spec(arg)
+            parser.add_argument(name, help=arg.help, **kwargs)
+        return parser
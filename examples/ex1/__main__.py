@@ -8,21 +8,46 @@ CLI entry-point.
 # Note: Must remain compatible with Python 3.5 so that the CLI can operate
 # and report sensible errors (i.e. advise that Python 3.6+ is required).
 
+import concurrent.futures
+import functools
+import json
 import logging
 import os
 import pathlib
 import re
 import subprocess as sp
 import sys
+import tempfile
+import threading
 import traceback
-from typing import Iterable, Optional, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
-import dcli
 
+_IS_WIN = sys.platform.startswith("win")
+_VENV_BIN_DIR = "Scripts" if _IS_WIN else "bin"
+_BASE_PYTHON_EXE = "python.exe" if _IS_WIN else "bin/python3"
 
 _THIS_DIR = pathlib.Path(__file__).parent
 _VENV_DIR = _THIS_DIR / ".venv"
 _CLI_FILE = _THIS_DIR / "cli.yaml"
+_REQS_OK_FILENAME = "reqs-ok.json"
+
+_PYTHON_VERSION_RE = re.compile(r"Python ((\d+)\.(\d+)\.\d+\S*)", re.ASCII)
+
+# Script run with a venv's Python to list the installed distributions in the
+# same form as 'pip freeze', avoiding the cost of starting pip.
+# Note: importlib.metadata is only available in Python 3.8+.
+_LIST_DISTRIBUTIONS_SCRIPT = """\
+try:
+    from importlib.metadata import distributions
+    dists = ((d.metadata["Name"], d.version) for d in distributions())
+except ImportError:
+    import pkg_resources
+    dists = ((d.project_name, d.version) for d in pkg_resources.working_set)
+for name, version in dists:
+    if name:
+        print("{}=={}".format(name, version))
+"""
 
 logger = logging.getLogger(__name__)
 
@@ -68,36 +93,28 @@ class MissingReqsError(UserFacingError):
         )
 
 
-def _is_version_at_least(version: str, major: int, minor: Optional[int] = None) -> bool:
-    """
-    Check that a given version meets the minimum requirements.
-
-    :param version:
-        Version string in the form "<major>.<minor>[.<more>]"
-    :param major:
-        Major version requirement.
-    :param minor:
-        Minor version requirement, if any.
-    :return:
-        Whether the given version is sufficient.
-    """
-    parts = version.split(".", maxsplit=3)
-    if int(parts[0]) < major:
-        return False
-    if minor and int(parts[1]) < minor:
-        return False
-    return True
+def _get_cache_dir() -> Optional[pathlib.Path]:
+    """Get the directory for caching between runs, or None if there isn't one."""
+    try:
+        cache_home = pathlib.Path(os.environ.get("XDG_CACHE_HOME", "~/.cache"))
+        return cache_home.expanduser() / "ex1"
+    except (KeyError, RuntimeError):
+        # The home directory couldn't be determined.
+        return None
 
 
 def _find_venv_exe(path: PathLike, exe: str) -> pathlib.Path:
     """Look for executable in a venv."""
-    path = pathlib.Path(path)
-    if sys.platform.startswith("win"):
-        if not exe.endswith(".exe"):
-            exe += ".exe"
-        full_path = path / "Scripts" / exe
-    else:
-        full_path = path / "bin" / exe
+    # Normalise the path so that equivalent paths share a cache entry.
+    return _find_venv_exe_cached(str(pathlib.Path(path)), exe)
+
+
+@functools.lru_cache(maxsize=16)
+def _find_venv_exe_cached(path: str, exe: str) -> pathlib.Path:
+    """Look for executable in a venv, caching successful lookups."""
+    if _IS_WIN and not exe.endswith(".exe"):
+        exe += ".exe"
+    full_path = pathlib.Path(path) / _VENV_BIN_DIR / exe
     if not full_path.is_file():
         raise FileNotFoundError("Executable not found at {}".format(full_path))
     return full_path
@@ -109,8 +126,7 @@ def _find_base_python_exe() -> pathlib.Path:
         prefix = sys.real_prefix
     else:
         prefix = sys.base_prefix
-    exe = "python.exe" if sys.platform.startswith("win") else "bin/python3"
-    return pathlib.Path(prefix) / exe
+    return pathlib.Path(prefix) / _BASE_PYTHON_EXE
 
 
 def _check_python_capabilities(location: Optional[PathLike] = None):
@@ -129,16 +145,28 @@ def _check_python_capabilities(location: Optional[PathLike] = None):
     # TODO: This should be broken up into two functions.
     if location is None:
         # Check version (3.6+ required).
-        version = "{v.major}.{v.minor}.{v.micro}".format(v=sys.version_info)
-        if not _is_version_at_least(version, 3, 6):
+        if sys.version_info < (3, 6):
+            version = "{v.major}.{v.minor}.{v.micro}".format(v=sys.version_info)
             raise UserFacingError(
                 user_msg="Python version 3.6+ required, detected {}".format(version)
             )
     else:
         python_exe = _find_venv_exe(location, "python")
-        # Check venv Python version.
-        try:
-            proc = sp.run(
+
+        def check_pip():
+            pip_exe = _find_venv_exe(location, "pip")
+            sp.run(
+                [str(pip_exe), "--version"],
+                stdout=sp.DEVNULL,
+                stderr=sp.DEVNULL,
+                check=True,
+                timeout=10,
+            )
+
+        # Run the checks concurrently, since each requires starting a subprocess.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            python_future = executor.submit(
+                sp.run,
                 [str(python_exe), "--version"],
                 stdout=sp.PIPE,
                 stderr=sp.PIPE,
@@ -146,30 +174,29 @@ def _check_python_capabilities(location: Optional[PathLike] = None):
                 check=True,
                 timeout=1,
             )
-            version = re.match(r"Python (\d\.\d+\.\d+\S*)", proc.stdout).group(1)
+            pip_future = executor.submit(check_pip)
+
+        # Check venv Python version.
+        try:
+            proc = python_future.result()
+            match = _PYTHON_VERSION_RE.match(proc.stdout)
+            version = match.group(1)
+            version_info = (int(match.group(2)), int(match.group(3)))
         except (sp.CalledProcessError, sp.TimeoutExpired):
             raise UserFacingError(user_msg="Unable to determine Python version")
         except AttributeError:
             logger.debug(
-                "Unexpected output from '%s --version':\n%s", python_exe, proc.output
+                "Unexpected output from '%s --version':\n%s", python_exe, proc.stdout
             )
             raise UserFacingError(user_msg="Unable to determine Python version")
         else:
-            if not _is_version_at_least(version, 3, 6):
+            if version_info < (3, 6):
                 raise UserFacingError(
                     user_msg="Python3.6+ required, detected {}".format(version)
                 )
         # Check pip is available.
         try:
-            pip_exe = _find_venv_exe(location, "pip")
-            sp.run(
-                [str(pip_exe), "--version"],
-                stdout=sp.PIPE,
-                stderr=sp.PIPE,
-                universal_newlines=True,
-                check=True,
-                timeout=10,
-            )
+            pip_future.result()
         except (FileNotFoundError, sp.CalledProcessError, sp.TimeoutExpired) as e:
             raise NoVenvPipError(
                 user_msg="Pip doesn't seem to be installed into the virtual "
@@ -177,6 +204,96 @@ def _check_python_capabilities(location: Optional[PathLike] = None):
             ) from e
 
 
+def _get_requirements_fingerprint(python_exe: PathLike, req_path: PathLike) -> List:
+    """
+    Get a fingerprint of the state checked by a requirements check.
+
+    The venv's site-packages directory is modified whenever packages are
+    installed or removed, so a check only needs rerunning if this or the
+    requirements file has changed.
+
+    :param python_exe:
+        The path to the venv python executable.
+    :param req_path:
+        The path to the requirements file.
+    :return:
+        The fingerprint, as a JSON-serialisable list.
+    :raises OSError:
+        If the files can't be accessed or site-packages can't be found.
+    """
+    venv_dir = pathlib.Path(python_exe).parent.parent
+    site_packages_dirs = sorted(venv_dir.glob("lib/python*/site-packages")) + sorted(
+        venv_dir.glob("Lib/site-packages")
+    )
+    if not site_packages_dirs:
+        # Without this the fingerprint wouldn't change when packages do.
+        raise OSError("Unable to find site-packages under {}".format(venv_dir))
+    return [
+        str(python_exe),
+        os.stat(str(req_path)).st_mtime_ns,
+        [os.stat(str(p)).st_mtime_ns for p in site_packages_dirs],
+    ]
+
+
+def _read_reqs_ok_cache() -> Dict[str, Any]:
+    """Read the fingerprints of the last successful requirements checks."""
+    cache_dir = _get_cache_dir()
+    if cache_dir is None:
+        return {}
+    try:
+        with open(str(cache_dir / _REQS_OK_FILENAME)) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Ignore a cache file that has somehow been corrupted.
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_reqs_ok_cache(cache: Dict[str, Any]):
+    """Write the fingerprints of the last successful requirements checks."""
+    cache_dir = _get_cache_dir()
+    if cache_dir is None:
+        return
+    cache_file = cache_dir / _REQS_OK_FILENAME
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(str(cache_file), "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        logger.debug("Failed to write %s", cache_file, exc_info=True)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_requirements(
+    req_path: str, mtime_ns: int
+) -> Tuple[FrozenSet[Tuple[str, ...]], FrozenSet[str]]:
+    """
+    Load requirements from a requirements file.
+
+    The modification time is only used as part of the cache key, so that the
+    file is reread if it changes.
+
+    :param req_path:
+        The path to the requirements file.
+    :param mtime_ns:
+        The modification time of the requirements file.
+    :return:
+        A tuple of the exact requirements, as (name, version) tuples, and the
+        names of requirements without a version.
+    """
+    with open(req_path) as f:
+        lines = {
+            L.lower()
+            for L in f.readlines()
+            if "-r " not in L and L.strip() and not L.strip().startswith("#")
+        }
+    exact_requirements = frozenset(
+        tuple(L.strip().split("==")[:2]) for L in lines if "==" in L
+    )
+    free_requirements = frozenset(L.strip() for L in lines if "==" not in L)
+    return exact_requirements, free_requirements
+
+
 def _check_requirements(python_exe: PathLike, *, dev: bool = False):
     """
     Check the installed requirements satisfy the project requirements.
@@ -190,47 +307,64 @@ def _check_requirements(python_exe: PathLike, *, dev: bool = False):
     :raises MissingReqsError:
         If the requirements aren't satisfied.
     """
+    if dev:
+        req_path = _THIS_DIR / "requirements-dev.txt"
+        # TODO: Should also be checking main project reqs.
+    else:
+        req_path = _THIS_DIR / "requirements.txt"
+
+    # Skip the check if nothing has changed since it last succeeded.
+    try:
+        fingerprint = _get_requirements_fingerprint(python_exe, req_path)
+    except OSError:
+        fingerprint = None
+    reqs_ok_cache = _read_reqs_ok_cache()
+    if fingerprint is not None and reqs_ok_cache.get(str(req_path)) == fingerprint:
+        logger.debug("Requirements unchanged since last successful check")
+        return
+
     try:
-        proc = sp.run(
-            [str(python_exe), "-m", "pip", "freeze", "--all"],
+        # Parse the output as it's read rather than storing it all first.
+        # Stderr goes to a file so that it can't fill a pipe and block the
+        # process while stdout is being read.
+        with tempfile.TemporaryFile("w+") as stderr_file, sp.Popen(
+            [str(python_exe), "-c", _LIST_DISTRIBUTIONS_SCRIPT],
             stdout=sp.PIPE,
-            stderr=sp.PIPE,
-            check=True,
+            stderr=stderr_file,
             universal_newlines=True,
-            timeout=5,
-        )
-        installed = {
-            tuple(L.lower().strip().split("==")) for L in proc.stdout.splitlines()
-        }
+        ) as proc:
+            timer = threading.Timer(5, proc.kill)
+            timer.start()
+            try:
+                installed = {tuple(L.lower().strip().split("==")) for L in proc.stdout}
+            finally:
+                timer.cancel()
+            proc.wait()
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                raise sp.CalledProcessError(
+                    proc.returncode, proc.args, stderr=stderr_file.read()
+                )
     except Exception as e:
         raise UserFacingError(user_msg="Error checking installed packages") from e
 
-    if dev:
-        req_path = _THIS_DIR / "requirements-dev.txt"
-        # TODO: Should also be checking main project reqs.
-    else:
-        req_path = _THIS_DIR / "requirements.txt"
     try:
-        with open(req_path) as f:
-            lines = {
-                L.lower()
-                for L in f.readlines()
-                if "-r " not in L and L.strip() and not L.strip().startswith("#")
-            }
-        exact_requirements = {
-            tuple(L.strip().split("==")[:2]) for L in lines if "==" in L
-        }
-        free_requirements = {L.strip() for L in lines if "==" not in L}
+        exact_requirements, free_requirements = _load_requirements(
+            str(req_path), req_path.stat().st_mtime_ns
+        )
     except Exception as e:
         raise UserFacingError(user_msg="Error reading project requirements") from e
 
-    missing_reqs = {
-        *["==".join(r) for r in exact_requirements - installed],
-        *(free_requirements - {r[0] for r in installed}),
-    }
+    installed_names = {r[0] for r in installed}
+    missing_reqs = {"==".join(r) for r in exact_requirements - installed}
+    missing_reqs |= free_requirements - installed_names
     if missing_reqs:
         raise MissingReqsError(sorted(missing_reqs))
 
+    if fingerprint is not None:
+        reqs_ok_cache[str(req_path)] = fingerprint
+        _write_reqs_ok_cache(reqs_ok_cache)
+
 
 def _check_venv(path: PathLike):
     """
@@ -273,13 +407,16 @@ def _create_venv(path: PathLike):
     try:
         sp.run(
             [str(python_exe), "-m", "venv", str(path)],
-            stdout=sp.PIPE,
+            stdout=sp.DEVNULL,
             stderr=sp.PIPE,
             check=True,
             timeout=20,
         )
     except (sp.CalledProcessError, sp.TimeoutExpired) as e:
         raise UserFacingError(user_msg="Error creating virtual environment") from e
+    finally:
+        # The venv's executables may have changed.
+        _find_venv_exe_cached.cache_clear()
 
 
 # ------------------------------------------------------------------------------
@@ -335,7 +472,7 @@ def make_venv(args):
     try:
         sp.run(
             [str(pip_exe), "install", "-U", "pip"],
-            stdout=sp.PIPE,
+            stdout=sp.DEVNULL,
             stderr=sp.PIPE,
             check=True,
         )
@@ -353,7 +490,7 @@ def make_venv(args):
     try:
         sp.run(
             [str(pip_exe), "install", "-r", str(req_file)],
-            stdout=sp.PIPE,
+            stdout=sp.DEVNULL,
             stderr=sp.PIPE,
             check=True,
         )
@@ -424,6 +561,10 @@ def _save_error_to_file(exc: Exception):
 
 
 def main(argv) -> int:
+    # Imported here to avoid the cost of importing dcli (and yaml) when this
+    # module is imported without running the CLI.
+    import dcli
+
     # Select frontend to use.
     frontend_envvar = os.environ.get("DCLI_FRONTEND")
     if frontend_envvar and frontend_envvar.upper() in dcli.Frontend.__members__:
@@ -432,8 +573,12 @@ def main(argv) -> int:
         frontend = dcli.Frontend.ARGPARSE
 
     # Load the CLI schema and parse args.
-    prog = "run.bat" if sys.platform.startswith("win") else "run.sh"
-    parser = dcli.create_cli_parser(_CLI_FILE, frontend=frontend, prog=prog)
+    # Set EX1_NO_SCHEMA_CACHE to always load the schema from the YAML file.
+    cache_dir = None if os.environ.get("EX1_NO_SCHEMA_CACHE") else _get_cache_dir()
+    prog = "run.bat" if _IS_WIN else "run.sh"
+    parser = dcli.create_cli_parser(
+        _CLI_FILE, frontend=frontend, cache_dir=cache_dir, prog=prog
+    )
     args = parser.parse_args(argv)
     logger.debug("Got args:", args)
 
@@ -442,7 +587,6 @@ def main(argv) -> int:
         exit_code = _COMMANDS[args.command](args)
     except UserFacingError as e:
         print("ERROR:", e.user_msg, file=sys.stderr)
-        _save_error_to_file(e)
         exit_code = e.exit_code
     except Exception as e:
         print(